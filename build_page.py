@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
+import jinja2
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 
 PAGE_TITLE = "All DJ headphones under $100 — lowest price first"
 PAGE_DESC = (
@@ -16,13 +24,8 @@ PAGE_DESC = (
 DEFAULT_KEYWORDS = "dj headphones"
 DEFAULT_MAX_PRICE_CENTS = 10000  # $100.00
 
-
-def _html_escape(s: str) -> str:
-    return (s.replace("&", "&amp;")
-             .replace("<", "&lt;")
-             .replace(">", "&gt;")
-             .replace('"', "&quot;")
-             .replace("'", "&#39;"))
+BUILD_CACHE_PATH = ".build.cache"
+OUTPUT_PATHS = ("index.html", "products.json")
 
 
 def load_asins(path: str = "asin_list.json") -> List[str]:
@@ -55,86 +58,47 @@ def affiliate_search_url(partner_tag: str, keywords: str = DEFAULT_KEYWORDS, max
     )
 
 
-HTML_TEMPLATE = """<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{title}</title>
-  <meta name="description" content="{desc}">
-  <style>
-    body {{ font-family: system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif; margin: 0; background:#fafafa; color:#111; }}
-    header {{ max-width: 980px; margin: 0 auto; padding: 28px 16px 8px; }}
-    h1 {{ font-size: 28px; margin: 0 0 8px; }}
-    p {{ margin: 0 0 10px; line-height: 1.4; }}
-    .meta {{ color:#444; font-size: 14px; }}
-    main {{ max-width: 980px; margin: 0 auto; padding: 8px 16px 32px; }}
-    .card {{ background:white; border-radius: 12px; overflow:hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.06); padding: 14px; margin-bottom: 14px; }}
-    table {{ width: 100%; border-collapse: collapse; }}
-    th, td {{ padding: 12px 10px; border-bottom: 1px solid #eee; vertical-align: middle; }}
-    th {{ text-align: left; font-size: 13px; color:#444; background:#f5f5f5; }}
-    td.buy {{ width: 160px; text-align: right; white-space:nowrap; }}
-    a {{ color:#0b57d0; text-decoration: none; }}
-    a:hover {{ text-decoration: underline; }}
-    .btn {{ display:inline-block; padding: 9px 12px; border:1px solid #ddd; border-radius: 10px; background:#fff; font-weight: 600; }}
-    .btn:hover {{ background:#f7f7f7; text-decoration:none; }}
-    .note {{ font-size: 14px; color:#444; }}
-    footer {{ max-width: 980px; margin: 0 auto; padding: 18px 16px 40px; color:#555; font-size: 13px; }}
-    footer a {{ color:#444; }}
-  </style>
-</head>
-<body>
-  <header>
-    <h1>{h1}</h1>
-    <p>{pdesc}</p>
-    <p class="meta">Daily build: {updated}</p>
-  </header>
-
-  <main>
-    <div class="card">
-      <p class="note"><strong>Note:</strong> Live prices require Amazon Product Advertising API access. Until then, use the buttons below to view current prices on Amazon.</p>
-      <p><a class="btn" href="{search_url}" rel="nofollow sponsored">View Amazon results under $100 (price low→high)</a></p>
-    </div>
-
-    <div class="card">
-      <table>
-        <thead>
-          <tr>
-            <th>ASIN</th>
-            <th>Product link</th>
-            <th></th>
-          </tr>
-        </thead>
-        <tbody>
-          {rows}
-        </tbody>
-      </table>
-    </div>
-  </main>
-
-  <footer>
-    <p><strong>Affiliate disclosure:</strong> As an Amazon Associate, I earn from qualifying purchases.</p>
-    <p><a href="privacy.html">Privacy</a> · <a href="disclosure.html">Disclosure</a></p>
-  </footer>
-</body>
-</html>
-"""
-
-
-def render_rows(asins: List[str], partner_tag: str) -> str:
-    if not asins:
-        return '<tr><td colspan="3">No ASINs found. Add them to asin_list.json.</td></tr>'
-    out = []
-    for asin in asins:
-        url = affiliate_dp_url(asin, partner_tag)
-        out.append(
-            "<tr>"
-            f"<td>{_html_escape(asin)}</td>"
-            f'<td><a href="{_html_escape(url)}" rel="nofollow sponsored">Open product</a></td>'
-            f'<td class="buy"><a class="btn" href="{_html_escape(url)}" rel="nofollow sponsored">Check price</a></td>'
-            "</tr>"
-        )
-    return "\n".join(out)
+_TEMPLATE_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(os.path.dirname(os.path.abspath(__file__))),
+    autoescape=True,
+    auto_reload=False,
+    trim_blocks=True,
+    keep_trailing_newline=True,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+)
+TEMPLATE = _TEMPLATE_ENV.get_template("index.html.j2")
+
+
+def get_template(name: str) -> jinja2.Template:
+    # Other page variants (e.g. the offline priced table) share TEMPLATE's environment.
+    return _TEMPLATE_ENV.get_template(name)
+
+
+def _build_key(context: Dict[str, Any]) -> str:
+    # Hash the data the template receives (links already resolved) plus the
+    # template source; the build date is deliberately left out.
+    data = orjson.dumps(context) if orjson is not None else json.dumps(context).encode("utf-8")
+    h = hashlib.sha256(data)
+    with open(TEMPLATE.filename, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _read_build_cache(path: str = BUILD_CACHE_PATH) -> List[str]:
+    # Line 1 is the input key, then one digest per output file, in OUTPUT_PATHS order.
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().split()
+    except FileNotFoundError:
+        return []
 
 
 def main() -> None:
@@ -143,22 +107,35 @@ def main() -> None:
         raise SystemExit("Missing AMZ_PARTNER_TAG. Set it as an environment variable or GitHub Actions secret.")
 
     asins = load_asins()
-    updated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-    html = HTML_TEMPLATE.format(
-        title=_html_escape(PAGE_TITLE),
-        desc=_html_escape(PAGE_DESC),
-        h1=_html_escape(PAGE_TITLE),
-        pdesc=_html_escape(PAGE_DESC),
-        updated=updated,
-        rows=render_rows(asins, partner_tag),
-        search_url=_html_escape(affiliate_search_url(partner_tag)),
-    )
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(html)
+    context: Dict[str, Any] = {
+        "title": PAGE_TITLE,
+        "desc": PAGE_DESC,
+        "items": [{"asin": asin, "url": affiliate_dp_url(asin, partner_tag)} for asin in asins],
+        "search_url": affiliate_search_url(partner_tag),
+    }
+    # Skip only when the inputs match and the outputs on disk are the ones that build wrote.
+    key = _build_key(context)
+    if _read_build_cache() == [key] + [_file_digest(p) for p in OUTPUT_PATHS]:
+        print("Inputs unchanged since last build; skipping render")
+        return
+
+    # The page shows when its data last changed, so skipped runs leave it accurate.
+    # Day granularity keeps same-day rebuilds byte-identical for CDN/ETag caches.
+    updated = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    # Stream template chunks straight to disk rather than joining the whole page first
+    TEMPLATE.stream(updated=updated, **context).dump("index.html", encoding="utf-8")
 
     # Emit a simple JSON artifact for debugging
-    with open("products.json", "w", encoding="utf-8") as f:
-        json.dump({"asins": asins, "updated": updated}, f, indent=2)
+    payload = {"asins": asins, "updated": updated}
+    if orjson is not None:
+        with open("products.json", "wb") as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        with open("products.json", "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+    with open(BUILD_CACHE_PATH, "w", encoding="utf-8") as f:
+        f.write("\n".join([key] + [_file_digest(p) or "" for p in OUTPUT_PATHS]) + "\n")
 
 
 if __name__ == "__main__":
@@ -2,52 +2,100 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-
-from paapi import PaapiClient, PaapiConfig
-
-
-@dataclass
-class Product:
-    asin: str
-    title: str
-    price_amount: float
-    price_display: str
-    currency: str
-    url: str
-    image_url: Optional[str] = None
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from typing import Any, Dict, List
+
+
+# PA-API's default quota is about one request per second. Request starts are
+# spaced REQUEST_INTERVAL_S apart; two pages in flight lets one response overlap
+# the next request, and a wave overshoots the last page by at most one call.
+PAGE_CONCURRENCY = 2
+REQUEST_INTERVAL_S = 1.0
+# Throttled (HTTP 429 / TooManyRequests) pages are retried with exponential backoff.
+THROTTLE_RETRIES = 3
+
+
+class _RequestPacer:
+    """Spaces request starts at least `interval_s` apart across threads."""
+
+    def __init__(self, interval_s: float) -> None:
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval_s
+        if start > now:
+            time.sleep(start - now)
+
+
+def _search_page(client: Any, pacer: _RequestPacer, item_page: int, **kwargs: Any) -> Dict[str, Any]:
+    from paapi import PaapiError
+
+    attempt = 0
+    while True:
+        pacer.wait()
+        try:
+            return client.search_items(item_page=item_page, **kwargs)
+        except PaapiError as e:
+            throttled = e.status_code == 429 or e.code == "TooManyRequests"
+            if not throttled or attempt >= THROTTLE_RETRIES:
+                raise
+        delay = pacer.interval_s * 2 ** attempt
+        print(f"PA-API throttled page {item_page}; retrying in {delay:.1f}s", file=sys.stderr)
+        time.sleep(delay)
+        attempt += 1
+
+
+# One product row, in the same shape that is written to products.json:
+# asin, title, price_amount, price_cents, price_display, currency, url, image_url.
+Product = Dict[str, Any]
 
 
 def _extract_products(resp: Dict[str, Any]) -> List[Product]:
-    items = (((resp or {}).get("SearchResult") or {}).get("Items")) or []
+    # Index directly and treat a missing level as absent, instead of chaining
+    # `.get(...) or {}` and allocating throwaway dicts on every lookup.
+    try:
+        items = resp["SearchResult"]["Items"] or []
+    except (KeyError, TypeError):
+        items = []
     out: List[Product] = []
     for it in items:
-        asin = it.get("ASIN") or ""
-        title = (((it.get("ItemInfo") or {}).get("Title") or {}).get("DisplayValue")) or ""
-        offers = (it.get("Offers") or {}).get("Listings") or []
-        if not offers:
+        try:
+            price = it["Offers"]["Listings"][0]["Price"]
+            amount = price["Amount"]
+        except (KeyError, IndexError, TypeError):
             continue
-        price = (offers[0].get("Price") or {})
-        amount = price.get("Amount")
-        display = price.get("DisplayAmount") or ""
-        currency = price.get("Currency") or ""
-
         if amount is None:
             continue
-
-        url = it.get("DetailPageURL") or ""
-        img = (((it.get("Images") or {}).get("Primary") or {}).get("Small") or {}).get("URL")
-
-        out.append(Product(
-            asin=str(asin),
-            title=str(title).strip(),
-            price_amount=float(amount),
-            price_display=str(display),
-            currency=str(currency),
-            url=str(url),
-            image_url=str(img) if img else None,
-        ))
+        price_amount = float(amount)
+
+        try:
+            title = it["ItemInfo"]["Title"]["DisplayValue"] or ""
+        except (KeyError, TypeError):
+            title = ""
+        try:
+            img = it["Images"]["Primary"]["Small"]["URL"]
+        except (KeyError, TypeError):
+            img = None
+
+        out.append({
+            "asin": str(it.get("ASIN") or ""),
+            "title": str(title).strip(),
+            "price_amount": price_amount,
+            "price_cents": round(price_amount * 100),
+            "price_display": str(price.get("DisplayAmount") or ""),
+            "currency": str(price.get("Currency") or ""),
+            "url": str(it.get("DetailPageURL") or ""),
+            "image_url": str(img) if img else None,
+        })
     return out
 
 
@@ -56,6 +104,9 @@ def fetch_all(
     max_price_usd: float = 100.0,
     max_pages: int = 10,
 ) -> List[Product]:
+    # Deferred so offline callers of _extract_products skip the HTTP stack import.
+    from paapi import PaapiClient, PaapiConfig, PaapiError
+
     access_key = os.environ.get("PAAPI_ACCESS_KEY", "").strip()
     secret_key = os.environ.get("PAAPI_SECRET_KEY", "").strip()
     partner_tag = os.environ.get("PAAPI_PARTNER_TAG", "").strip()
@@ -75,50 +126,62 @@ def fetch_all(
     )
     client = PaapiClient(cfg)
 
-    max_price_cents = int(round(max_price_usd * 100))
-
-    all_products: List[Product] = []
-    seen_asin = set()
-
-    for page in range(1, max_pages + 1):
-        resp = client.search_items(
-            keywords=keywords,
-            max_price_cents=max_price_cents,
-            item_page=page,
-            item_count=10,
-            search_index=os.environ.get("PAAPI_SEARCH_INDEX", "Electronics"),
-            availability=os.environ.get("PAAPI_AVAILABILITY", "Available"),
-        )
-        prods = _extract_products(resp)
-
-        if not prods:
-            break
-
-        for p in prods:
-            if p.asin in seen_asin:
-                continue
-            seen_asin.add(p.asin)
-            all_products.append(p)
-
-    all_products.sort(key=lambda p: p.price_amount)
-    return all_products
-
-
-def to_json(products: List[Product]) -> List[Dict[str, Any]]:
-    return [
-        {
-            "asin": p.asin,
-            "title": p.title,
-            "price_amount": p.price_amount,
-            "price_display": p.price_display,
-            "currency": p.currency,
-            "url": p.url,
-            "image_url": p.image_url,
-        }
-        for p in products
-    ]
+    max_price_cents = round(max_price_usd * 100)
+
+    # Keep the cheapest listing seen for each ASIN.
+    best: Dict[str, Product] = {}
+
+    search_index = os.environ.get("PAAPI_SEARCH_INDEX", "Electronics")
+    availability = os.environ.get("PAAPI_AVAILABILITY", "Available")
+
+    pacer = _RequestPacer(REQUEST_INTERVAL_S)
+
+    # Pages are independent, so fetch them in small paced waves and merge in
+    # page order so the result matches a sequential walk.
+    with ThreadPoolExecutor(max_workers=PAGE_CONCURRENCY) as ex:
+        page = 1
+        done = False
+        while not done and page <= max_pages:
+            wave = [
+                ex.submit(
+                    _search_page,
+                    client,
+                    pacer,
+                    keywords=keywords,
+                    max_price_cents=max_price_cents,
+                    item_page=p,
+                    item_count=10,
+                    search_index=search_index,
+                    availability=availability,
+                )
+                for p in range(page, min(page + PAGE_CONCURRENCY, max_pages + 1))
+            ]
+            page += len(wave)
+
+            for fut in wave:
+                try:
+                    resp = fut.result()
+                except PaapiError as e:
+                    # NoResults ends the walk like an empty page; persistent throttling
+                    # (after _search_page's retries) and other errors fail the fetch.
+                    if e.code != "NoResults":
+                        raise
+                    done = True
+                    break
+                prods = _extract_products(resp)
+
+                if not prods:
+                    done = True
+                    break
+
+                for p in prods:
+                    cur = best.get(p["asin"])
+                    if cur is None or p["price_cents"] < cur["price_cents"]:
+                        best[p["asin"]] = p
+
+    return sorted(best.values(), key=itemgetter("price_cents"))
 
 
 if __name__ == "__main__":
     items = fetch_all()
-    print(json.dumps(to_json(items), indent=2, ensure_ascii=False))
+    print(json.dumps(items, indent=2, ensure_ascii=False))
@@ -12,16 +12,51 @@ import hmac
 import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
-import requests
+if TYPE_CHECKING:
+    import httpx
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    # Compact UTF-8 body; the exact bytes are what payload_hash signs.
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_CONTENT_TYPE = "application/json; charset=utf-8"
+_CONTENT_ENCODING = "amz-1.0"
+_SIGNED_HEADERS = "content-encoding;content-type;host;x-amz-date;x-amz-target"
+_ALGORITHM = "AWS4-HMAC-SHA256"
+_SIGNED_HEADERS_BYTES = _SIGNED_HEADERS.encode("ascii")
+_ALGORITHM_BYTES = _ALGORITHM.encode("ascii")
+
+# Only the fields _extract_products reads; every extra resource inflates each page.
+_SEARCH_RESOURCES = (
+    "ItemInfo.Title",
+    "Offers.Listings.Price",
+    "Offers.Listings.Availability.Message",
+    "Images.Primary.Small",
+)
 
 
 def _sign(key: bytes, msg: str) -> bytes:
     return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
 
 
-def _hash_sha256_hex(data: bytes) -> str:
+def _hash_sha256_hex(data: Union[bytes, bytearray]) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
@@ -41,13 +76,57 @@ class PaapiConfig:
 
 
 class PaapiError(RuntimeError):
-    pass
+    def __init__(self, message: str, status_code: Optional[int] = None, code: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code  # first PA-API error code, e.g. "NoResults" or "TooManyRequests"
+
+
+def _first_error_code(data: Any) -> Optional[str]:
+    try:
+        return str(data["Errors"][0]["Code"])
+    except (KeyError, IndexError, TypeError):
+        return None
 
 
 class PaapiClient:
-    def __init__(self, config: PaapiConfig, session: Optional[requests.Session] = None) -> None:
+    def __init__(self, config: PaapiConfig, session: Optional[httpx.Client] = None) -> None:
         self.config = config
-        self.session = session or requests.Session()
+        if session is None:
+            # Imported lazily: only needed once a real HTTP call is set up.
+            import httpx
+
+            # HTTP/2 lets concurrent page fetches share one TLS connection.
+            session = httpx.Client(
+                http2=True,
+                timeout=20.0,
+                limits=httpx.Limits(max_keepalive_connections=4),
+            )
+        self.session = session
+        # Request-invariant pieces of the signing input, computed once per client.
+        self._endpoint = config.endpoint
+        self._host = config.host
+        self._canonical_headers_prefix = (
+            f"content-encoding:{_CONTENT_ENCODING}\n"
+            f"content-type:{_CONTENT_TYPE}\n"
+            f"host:{config.host}\n"
+        ).encode("utf-8")
+        self._cred_scope_tail = f"/{config.region}/{config.service}/aws4_request"
+        self._cred_scope_tail_bytes = self._cred_scope_tail.encode("utf-8")
+        self._credential_prefix = f"{_ALGORITHM} Credential={config.access_key}/"
+        self._k_secret = ("AWS4" + config.secret_key).encode("utf-8")
+        # Derived SigV4 signing key only depends on the date; keep the current day's.
+        self._signing_key_cache: Dict[str, bytes] = {}
+
+    def _signing_key(self, date_stamp: str) -> bytes:
+        k_signing = self._signing_key_cache.get(date_stamp)
+        if k_signing is None:
+            k_date = _sign(self._k_secret, date_stamp)
+            k_region = _sign(k_date, self.config.region)
+            k_service = _sign(k_region, self.config.service)
+            k_signing = _sign(k_service, "aws4_request")
+            self._signing_key_cache = {date_stamp: k_signing}
+        return k_signing
 
     def _sigv4_headers(
         self,
@@ -69,56 +148,47 @@ class PaapiClient:
         amz_date = now.strftime("%Y%m%dT%H%M%SZ")
         date_stamp = now.strftime("%Y%m%d")
 
-        content_type = "application/json; charset=utf-8"
-        content_encoding = "amz-1.0"
-        host = self.config.host
-
-        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        body = _json_dumps(payload)
         payload_hash = _hash_sha256_hex(body)
 
-        canonical_uri = request_path  # e.g. "/paapi5/searchitems"
-        canonical_querystring = ""
-        canonical_headers = (
-            f"content-encoding:{content_encoding}\n"
-            f"content-type:{content_type}\n"
-            f"host:{host}\n"
-            f"x-amz-date:{amz_date}\n"
-            f"x-amz-target:{amz_target}\n"
-        )
-        signed_headers = "content-encoding;content-type;host;x-amz-date;x-amz-target"
-        canonical_request = "\n".join([
-            "POST",
-            canonical_uri,
-            canonical_querystring,
-            canonical_headers,
-            signed_headers,
-            payload_hash,
-        ])
-
-        algorithm = "AWS4-HMAC-SHA256"
-        credential_scope = f"{date_stamp}/{self.config.region}/{self.config.service}/aws4_request"
-        string_to_sign = "\n".join([
-            algorithm,
-            amz_date,
-            credential_scope,
-            _hash_sha256_hex(canonical_request.encode("utf-8")),
-        ])
-
-        k_date = _sign(("AWS4" + self.config.secret_key).encode("utf-8"), date_stamp)
-        k_region = _sign(k_date, self.config.region)
-        k_service = _sign(k_region, self.config.service)
-        k_signing = _sign(k_service, "aws4_request")
-        signature = hmac.new(k_signing, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        amz_date_bytes = amz_date.encode("ascii")
+
+        # Assemble in bytes from pre-encoded fragments so only the per-request
+        # values are encoded, once, before hashing.
+        canonical_request = bytearray(b"POST\n")
+        canonical_request += request_path.encode("utf-8")  # e.g. "/paapi5/searchitems"
+        canonical_request += b"\n\n"  # empty canonical query string
+        canonical_request += self._canonical_headers_prefix
+        canonical_request += b"x-amz-date:"
+        canonical_request += amz_date_bytes
+        canonical_request += b"\nx-amz-target:"
+        canonical_request += amz_target.encode("utf-8")
+        canonical_request += b"\n\n"
+        canonical_request += _SIGNED_HEADERS_BYTES
+        canonical_request += b"\n"
+        canonical_request += payload_hash.encode("ascii")
+
+        string_to_sign = bytearray(_ALGORITHM_BYTES)
+        string_to_sign += b"\n"
+        string_to_sign += amz_date_bytes
+        string_to_sign += b"\n"
+        string_to_sign += date_stamp.encode("ascii")
+        string_to_sign += self._cred_scope_tail_bytes
+        string_to_sign += b"\n"
+        string_to_sign += _hash_sha256_hex(canonical_request).encode("ascii")
+
+        k_signing = self._signing_key(date_stamp)
+        signature = hmac.new(k_signing, string_to_sign, "sha256").hexdigest()
 
         authorization_header = (
-            f"{algorithm} Credential={self.config.access_key}/{credential_scope}, "
-            f"SignedHeaders={signed_headers}, Signature={signature}"
+            f"{self._credential_prefix}{date_stamp}{self._cred_scope_tail}, "
+            f"SignedHeaders={_SIGNED_HEADERS}, Signature={signature}"
         )
 
         headers = {
-            "host": host,
-            "content-type": content_type,
-            "content-encoding": content_encoding,
+            "host": self._host,
+            "content-type": _CONTENT_TYPE,
+            "content-encoding": _CONTENT_ENCODING,
             "x-amz-date": amz_date,
             "x-amz-target": amz_target,
             "Authorization": authorization_header,
@@ -127,13 +197,27 @@ class PaapiClient:
 
     def _post(self, path: str, target: str, payload: Dict[str, Any], timeout_s: int = 20) -> Dict[str, Any]:
         headers, body = self._sigv4_headers(target, payload, path)
-        url = self.config.endpoint + path
-        resp = self.session.post(url, headers=headers, data=body, timeout=timeout_s)
+        # httpx negotiates Accept-Encoding (gzip/deflate, plus br/zstd when available)
+        # and decompresses resp.content itself, so no header is set here.
+        url = self._endpoint + path
+        resp = self.session.post(url, headers=headers, content=body, timeout=timeout_s)
         if resp.status_code != 200:
-            raise PaapiError(f"PA-API HTTP {resp.status_code}: {resp.text[:500]}")
-        data = resp.json()
+            try:
+                code = _first_error_code(_json_loads(resp.content))
+            except ValueError:
+                code = None
+            raise PaapiError(
+                f"PA-API HTTP {resp.status_code}: {resp.text[:500]}",
+                status_code=resp.status_code,
+                code=code,
+            )
+        data = _json_loads(resp.content)
         if isinstance(data, dict) and data.get("Errors"):
-            raise PaapiError(f"PA-API Errors: {json.dumps(data['Errors'], ensure_ascii=False)[:800]}")
+            raise PaapiError(
+                f"PA-API Errors: {_json_dumps(data['Errors']).decode('utf-8')[:800]}",
+                status_code=resp.status_code,
+                code=_first_error_code(data),
+            )
         return data
 
     def search_items(
@@ -154,20 +238,12 @@ class PaapiClient:
         path = "/paapi5/searchitems"
         target = "com.amazon.paapi5.v1.ProductAdvertisingAPIv1.SearchItems"
 
-        if resources is None:
-            resources = [
-                "ItemInfo.Title",
-                "Offers.Listings.Price",
-                "Offers.Listings.Availability.Message",
-                "Images.Primary.Small",
-            ]
-
         payload: Dict[str, Any] = {
             "Keywords": keywords,
             "Marketplace": self.config.marketplace,
             "PartnerTag": self.config.partner_tag,
             "PartnerType": "Associates",
-            "Resources": resources,
+            "Resources": resources if resources is not None else _SEARCH_RESOURCES,
             "SearchIndex": search_index,
             "MaxPrice": int(max_price_cents),
             "ItemPage": int(item_page),
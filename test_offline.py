@@ -1,27 +1,42 @@
 from __future__ import annotations
 
+import functools
 import json
+import os
 from pathlib import Path
 
-from fetch_products import _extract_products, to_json
-from build_page import render_rows, HTML_TEMPLATE, PAGE_TITLE, PAGE_DESC, _html_escape
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json_loads = json.loads
+
+from fetch_products import _extract_products
+from build_page import PAGE_TITLE, affiliate_search_url, get_template
 from datetime import datetime, timezone
 
 
+SAMPLE_PATH = "sample_response.json"
+OFFLINE_DESC = "Offline render of sample_response.json, ordered from cheapest to most expensive."
+
+
+@functools.lru_cache(maxsize=4)
+def _load_sample(path: str, mtime: float) -> dict:
+    # mtime is part of the cache key so an edited sample is re-read.
+    return _json_loads(Path(path).read_bytes())
+
+
 def main() -> None:
-    resp = json.loads(Path("sample_response.json").read_text(encoding="utf-8"))
-    products = _extract_products(resp)
-    payload = to_json(products)
-
-    html = HTML_TEMPLATE.format(
-        title=_html_escape(PAGE_TITLE),
-        desc=_html_escape(PAGE_DESC),
-        h1=_html_escape(PAGE_TITLE),
-        pdesc=_html_escape(PAGE_DESC),
-        updated=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC"),
-        rows=render_rows(payload),
-    )
-    Path("index.offline.html").write_text(html, encoding="utf-8")
+    resp = _load_sample(SAMPLE_PATH, os.path.getmtime(SAMPLE_PATH))
+    payload = _extract_products(resp)
+
+    get_template("index.offline.html.j2").stream(
+        title=PAGE_TITLE,
+        desc=OFFLINE_DESC,
+        updated=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        items=payload,
+        search_url=affiliate_search_url("example-20"),
+    ).dump("index.offline.html", encoding="utf-8")
     print("Wrote index.offline.html with", len(payload), "rows")
 
 